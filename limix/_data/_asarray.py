@@ -5,10 +5,10 @@ def asarray(x, target, dims=None):
     from limix._bits.dask import is_series as is_dask_series
     from limix._bits.dask import array_shape_reveal
     from limix._bits.xarray import is_dataarray
-    from ._conf import CONF
+    from ._conf import DATA_DIMS, TARGETS
     from numpy import issubdtype, integer
 
-    if target not in CONF["targets"]:
+    if target not in TARGETS:
         raise ValueError(f"Unknown target name: {target}.")
 
     import dask.array as da
@@ -33,7 +33,7 @@ def asarray(x, target, dims=None):
     x.name = target
 
     while x.ndim < 2:
-        rdims = set(CONF["data_dims"]["trait"]).intersection(set(x.coords.keys()))
+        rdims = set(DATA_DIMS["trait"]).intersection(set(x.coords.keys()))
         rdims = rdims - set(x.dims)
         if len(rdims) == 1:
             dim = rdims.pop()
@@ -48,8 +48,8 @@ def asarray(x, target, dims=None):
         raise ValueError("`dims` must not contain duplicated values.")
 
     x = x.rename({x.dims[axis]: name for axis, name in dims.items()})
-    x = _set_missing_dim(x, CONF["data_dims"][target])
-    x = x.transpose(*CONF["data_dims"][target])
+    x = _set_missing_dim(x, DATA_DIMS[target])
+    x = x.transpose(*DATA_DIMS[target])
 
     if issubdtype(x.dtype, integer):
         x = x.astype(float)
@@ -1,21 +1,21 @@
 def assert_target(target):
-    from ._conf import CONF
+    from ._conf import TARGETS
 
-    if target not in CONF["targets"]:
+    if target not in TARGETS:
         raise ValueError(f"Unknown target `{target}`.")
 
 
 def assert_filetype(filetype):
-    from ._conf import CONF
+    from ._conf import FILETYPES
 
-    if filetype not in CONF["filetypes"]:
+    if filetype not in FILETYPES:
         raise ValueError(f"Unknown filetype `{filetype}`.")
 
 
 def assert_likelihood(likname):
-    from ._conf import CONF
+    from ._conf import LIKELIHOODS
 
-    if likname not in CONF["likelihoods"]:
+    if likname not in LIKELIHOODS:
         msg = "Unrecognized likelihood name: {}.\n".format(likname)
-        msg += "Valid names are: {}.".format(list(CONF["likelihoods"]))
+        msg += "Valid names are: {}.".format(list(LIKELIHOODS))
         raise ValueError(msg)
@@ -1,30 +1,48 @@
-CONF = {
-    "likelihoods": set(["normal", "bernoulli", "probit", "binomial", "poisson"]),
-    "targets": set(
-        [
-            "trait",
-            "covariate",
-            "covariance",
-            "genotype",
-            "covariate",
-            "inter0",
-            "inter1",
-            "env",
-            "env0",
-            "env1",
-        ]
-    ),
-    "filetypes": set(["csv", "bed"]),
-    "dim_axis": {
+from sys import intern
+from types import MappingProxyType
+
+
+def _frozenset(names):
+    return frozenset(intern(n) for n in names)
+
+
+def _proxy(mapping):
+    return MappingProxyType({intern(k): v for k, v in mapping.items()})
+
+
+LIKELIHOODS = _frozenset(["normal", "bernoulli", "probit", "binomial", "poisson"])
+
+TARGETS = _frozenset(
+    [
+        "trait",
+        "covariate",
+        "covariance",
+        "genotype",
+        "inter0",
+        "inter1",
+        "env",
+        "env0",
+        "env1",
+    ]
+)
+
+FILETYPES = _frozenset(["csv", "bed"])
+
+DIM_AXIS = _proxy(
+    {
         "sample": 0,
         "trait": 1,
         "candidate": 1,
         "covariate": 1,
         "sample_0": 0,
         "sample_1": 1,
-    },
-    "dim_names": {"sample", "candidate", "covariate", "trait"},
-    "data_synonym": {
+    }
+)
+
+DIM_NAMES = _frozenset(["sample", "candidate", "covariate", "trait"])
+
+DATA_SYNONYM = _proxy(
+    {
         "y": "trait",
         "trait": "y",
         "G": "genotype",
@@ -33,28 +51,41 @@ CONF = {
         "covariate": "M",
         "K": "covariance",
         "covariance": "K",
-    },
-    "data_dims": {
-        "trait": ["sample", "trait"],
-        "genotype": ["sample", "candidate"],
-        "covariate": ["sample", "covariate"],
-        "covariance": ["sample_0", "sample_1"],
-        "inter0": ["sample", "inter"],
-        "inter1": ["sample", "inter"],
-        "env": ["sample", "env"],
-        "env0": ["sample", "env"],
-        "env1": ["sample", "env"],
-    },
-    "varname_to_target": {
-        "y": "trait",
-        "M": "covariate",
-        "G": "genotype",
-        "K": "covariance",
-    },
-    "target_to_varname": {
-        "trait": "y",
-        "covariate": "M",
-        "genotype": "G",
-        "covariance": "K",
-    },
-}
+    }
+)
+
+DATA_DIMS = _proxy(
+    {
+        "trait": ("sample", "trait"),
+        "genotype": ("sample", "candidate"),
+        "covariate": ("sample", "covariate"),
+        "covariance": ("sample_0", "sample_1"),
+        "inter0": ("sample", "inter"),
+        "inter1": ("sample", "inter"),
+        "env": ("sample", "env"),
+        "env0": ("sample", "env"),
+        "env1": ("sample", "env"),
+    }
+)
+
+VARNAME_TO_TARGET = _proxy(
+    {"y": "trait", "M": "covariate", "G": "genotype", "K": "covariance"}
+)
+
+TARGET_TO_VARNAME = _proxy(
+    {"trait": "y", "covariate": "M", "genotype": "G", "covariance": "K"}
+)
+
+CONF = _proxy(
+    {
+        "likelihoods": LIKELIHOODS,
+        "targets": TARGETS,
+        "filetypes": FILETYPES,
+        "dim_axis": DIM_AXIS,
+        "dim_names": DIM_NAMES,
+        "data_synonym": DATA_SYNONYM,
+        "data_dims": DATA_DIMS,
+        "varname_to_target": VARNAME_TO_TARGET,
+        "target_to_varname": TARGET_TO_VARNAME,
+    }
+)
@@ -3,13 +3,13 @@ from collections import Counter
 from .._bits.deco import return_none_if_none
 from .._bits.xarray import set_coord
 from ._asarray import asarray as _asarray
-from ._conf import CONF
+from ._conf import DATA_DIMS, VARNAME_TO_TARGET
 
 set_coord = return_none_if_none(set_coord)
 _asarray = return_none_if_none(_asarray)
 
 
-def conform_dataset(y, M=None, G=None, K=None):
+def conform_dataset(y, M=None, G=None, K=None, assume_aligned=False):
     r""" Convert data types to DataArray.
 
     This is a fundamental function for :mod:`limix` as it standardise outcome,
@@ -19,6 +19,30 @@ def conform_dataset(y, M=None, G=None, K=None):
     data via dask arrays. It also supports arrays with different dimensionality and
     types, mixture of indexed and non-indexed arrays, and repeated sample labels.
 
+    Sample matching can be skipped by setting ``assume_aligned=True`` when the arrays
+    are known to have the same samples in the same order, as for data preprocessed
+    once and analysed many times. The arrays are then wrapped without being
+    reindexed, and the sample labels of the outcome, if any, are used for all of
+    them.
+
+    Parameters
+    ----------
+    y : array_like
+        Outcome.
+    M : array_like, optional
+        Covariates.
+    G : array_like, optional
+        Genotype.
+    K : array_like, optional
+        Covariance.
+    assume_aligned : bool, optional
+        ``True`` to skip sample matching; ``False`` otherwise. Defaults to ``False``.
+
+    Returns
+    -------
+    dict
+        Outcome, covariates, genotype, and covariance as data arrays.
+
     Examples
     --------
 
@@ -89,10 +113,10 @@ def conform_dataset(y, M=None, G=None, K=None):
         >>> with pytest.raises(ValueError):
         ...     conform_dataset(y, G=G, K=K)
     """
-    y = _asarray(y, "trait", CONF["data_dims"]["trait"])
-    M = _asarray(M, "covariate", CONF["data_dims"]["covariate"])
-    G = _asarray(G, "genotype", CONF["data_dims"]["genotype"])
-    K = _asarray(K, "covariance", CONF["data_dims"]["covariance"])
+    y = _asarray(y, "trait", DATA_DIMS["trait"])
+    M = _asarray(M, "covariate", DATA_DIMS["covariate"])
+    G = _asarray(G, "genotype", DATA_DIMS["genotype"])
+    K = _asarray(K, "covariance", DATA_DIMS["covariance"])
 
     data = {"y": y, "M": M, "G": G, "K": K}
     data = {k: v for k, v in data.items() if v is not None}
@@ -109,9 +133,12 @@ def conform_dataset(y, M=None, G=None, K=None):
         if t[0] in data
     ]
 
+    if assume_aligned:
+        return _conform_aligned(data, sample_dims)
+
     data = _fix_samples(data, sample_dims)
     for n in data.keys():
-        data[n].name = CONF["varname_to_target"][n]
+        data[n].name = VARNAME_TO_TARGET[n]
 
     nsamples = len(data["y"].coords["sample"])
     same_size = all(data[n].coords[d].size == nsamples for n, d in sample_dims)
@@ -127,6 +154,28 @@ def conform_dataset(y, M=None, G=None, K=None):
     return {k: data.get(k, None) for k in ["y", "M", "G", "K"]}
 
 
+def _conform_aligned(data, sample_dims):
+    from numpy import asarray
+
+    nsamples = data["y"].sizes["sample"]
+    if any(data[n].sizes[d] != nsamples for n, d in sample_dims):
+        raise ValueError("Aligned arrays must have the same number of samples.")
+
+    if "sample" in data["y"].coords:
+        samples = data["y"].coords["sample"].values
+    else:
+        samples = asarray(_default_sample_coords(nsamples), object)
+
+    for n, d in sample_dims:
+        data[n] = data[n].assign_coords({d: samples})
+        data[n].name = VARNAME_TO_TARGET[n]
+
+    if "M" not in data:
+        data["M"] = _default_covariates(samples)
+
+    return {k: data.get(k, None) for k in ["y", "M", "G", "K"]}
+
+
 def _default_covariates(samples):
     from numpy import ones, asarray
     from xarray import DataArray
@@ -0,0 +1,20 @@
+import pytest
+
+from limix._data._conf import CONF
+
+
+def test_data_conf():
+    targets = CONF["targets"]
+    assert isinstance(targets, frozenset)
+    assert set(CONF["data_dims"]) <= targets
+    assert set(CONF["target_to_varname"]) <= targets
+    assert set(CONF["varname_to_target"].values()) <= targets
+
+    for k, v in CONF["data_synonym"].items():
+        assert CONF["data_synonym"][v] == k
+
+    with pytest.raises(TypeError):
+        CONF["targets"] = frozenset()
+
+    with pytest.raises(TypeError):
+        CONF["data_dims"]["trait"] = ("sample",)
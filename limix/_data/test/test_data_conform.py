@@ -1,3 +1,5 @@
+import pytest
+from numpy import array
 from numpy.random import RandomState
 from numpy.testing import assert_, assert_array_equal
 from xarray import DataArray
@@ -18,3 +20,33 @@ def test_data_conform_dataset():
     assert_(isinstance(G, DataArray))
     assert_array_equal(y.shape, (5, 1))
     assert_array_equal(G.shape, (5, 2))
+
+
+def test_data_conform_dataset_assume_aligned():
+    random = RandomState(0)
+
+    y = random.randn(5)
+    M = random.randn(5, 2)
+    G = random.randn(5, 3)
+    K = random.randn(5, 5)
+
+    data0 = conform_dataset(y, M, G=G, K=K)
+    data1 = conform_dataset(y, M, G=G, K=K, assume_aligned=True)
+    for k in ["y", "M", "G", "K"]:
+        assert_array_equal(data0[k].values, data1[k].values)
+        assert_array_equal(data0[k].dims, data1[k].dims)
+        assert_(data0[k].name == data1[k].name)
+    assert_array_equal(data0["y"].sample.values, data1["y"].sample.values)
+    assert_array_equal(data1["y"].sample.values, data1["K"].sample_1.values)
+
+    data1 = conform_dataset(y, G=G, assume_aligned=True)
+    assert_array_equal(data1["M"].values, [[1.0]] * 5)
+    assert_array_equal(data1["M"].sample.values, data1["G"].sample.values)
+
+    samples = array(list("abcde"), object)
+    y = DataArray(y, dims=["sample"], coords={"sample": samples})
+    data1 = conform_dataset(y, G=G, assume_aligned=True)
+    assert_array_equal(data1["G"].sample.values, list("abcde"))
+
+    with pytest.raises(ValueError):
+        conform_dataset(y, G=G[:4], assume_aligned=True)
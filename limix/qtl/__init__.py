@@ -2,7 +2,8 @@
 Quantitative trait locus analysis.
 """
 
+from ._cache import clear as clear_cache
 from ._iscan import iscan
 from ._scan import scan
 
-__all__ = ["scan", "iscan"]
+__all__ = ["scan", "iscan", "clear_cache"]
@@ -1,6 +1,7 @@
-def assert_finite(Y, M, K):
-    from numpy_sugar import is_all_finite
+from limix._cache import cache
+
 
+def assert_finite(Y, M, K):
     if not is_all_finite(Y):
         raise ValueError("Outcome must have finite values only.")
 
@@ -10,3 +11,65 @@ def assert_finite(Y, M, K):
     if K is not None:
         if not is_all_finite(K):
             raise ValueError("Covariate matrix must have finite values only.")
+
+
+def is_all_finite(a):
+    """
+    Check whether all values are finite in a single pass over memory.
+
+    The compiled kernel stops at the first non-finite value and does not allocate
+    any temporary array. Without numba, the values are summed first, which is cheap
+    and finite in the usual case, and :func:`numpy.isfinite` is only evaluated to
+    rule out an overflow of the sum.
+
+    Parameters
+    ----------
+    a : array_like
+        Values.
+
+    Returns
+    -------
+    bool
+        ``True`` if values are all finite; ``False`` otherwise.
+    """
+    from numpy import asarray, ascontiguousarray
+
+    a = asarray(a)
+    if a.dtype.kind != "f":
+        a = a.astype(float)
+    if not (a.flags.c_contiguous or a.flags.f_contiguous):
+        a = ascontiguousarray(a)
+
+    a = a.reshape(-1, order="A")
+    kernel = _get_kernel("_all_finite")
+    if kernel is not None:
+        return bool(kernel(a))
+    return _all_finite_numpy(a)
+
+
+@cache
+def _get_kernel(name):
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+
+    return njit(nogil=True, cache=True)(globals()[name])
+
+
+def _all_finite(a):
+    for x in a:
+        # 𝑥 - 𝑥 is nan for infinite and nan values.
+        if x - x != 0:
+            return False
+    return True
+
+
+def _all_finite_numpy(a):
+    from numpy import errstate, isfinite
+
+    with errstate(over="ignore", invalid="ignore"):
+        if isfinite(a.sum()):
+            return True
+    return bool(isfinite(a).all())
+
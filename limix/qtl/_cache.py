@@ -0,0 +1,78 @@
+from collections import OrderedDict
+
+_cache = OrderedDict()
+# Eigendecompositions and null models are counted alike.
+_maxsize = 8
+
+
+def digest(*objs):
+    """
+    Hash of the content of the given arrays.
+
+    Parameters
+    ----------
+    *objs : array_like, str, or None
+        Objects to be hashed.
+
+    Returns
+    -------
+    str
+        Hexadecimal digest.
+    """
+    import hashlib
+    from numpy import asarray, ascontiguousarray
+
+    h = hashlib.blake2b(digest_size=20)
+
+    for obj in objs:
+        if obj is None:
+            h.update(b"None")
+        elif isinstance(obj, str):
+            h.update(obj.encode())
+        else:
+            obj = asarray(obj)
+            h.update(str((obj.shape, obj.dtype.str)).encode())
+            h.update(ascontiguousarray(obj).view("uint8"))
+        h.update(b"|")
+
+    return h.hexdigest()
+
+
+def memoize(key, func):
+    """
+    Return the cached value for ``key``, calling ``func`` on a miss.
+
+    The least recently used entry is dropped once the cache is full.
+
+    Parameters
+    ----------
+    key : hashable
+        Cache key.
+    func : callable
+        Function without arguments computing the value.
+
+    Returns
+    -------
+    object
+        Cached value.
+    """
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+
+    value = func()
+    _cache[key] = value
+    while len(_cache) > _maxsize:
+        _cache.popitem(last=False)
+
+    return value
+
+
+def clear():
+    """
+    Remove all cached values.
+
+    It releases the eigendecompositions and null models kept by
+    :func:`limix.qtl.scan` when called with ``cache=True``.
+    """
+    _cache.clear()
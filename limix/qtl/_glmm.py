@@ -0,0 +1,117 @@
+from glimix_core.glmm import GLMMNormal as _GLMMNormal
+
+
+class GLMMNormal(_GLMMNormal):
+    """
+    :class:`glimix_core.glmm.GLMMNormal` with shared precomputations.
+
+    The original implementation forms 𝙺 = 𝚀₀𝚂₀𝚀₀ᵀ and solves several linear systems
+    of 𝙰 = 𝑣₀𝙺 + 𝑣₁𝙸 + 𝚺 for each evaluation of the marginal likelihood and again for
+    its gradient, two of them with n right-hand sides. Here 𝙺 is formed once, and a
+    single Cholesky factorisation of 𝙰 gives both the value and the gradient, which
+    are cached together until the parameters change.
+
+    Parameters
+    ----------
+    eta : array_like
+        Natural parameter 𝜂 of the EP sites.
+    tau : array_like
+        Natural parameter 𝜏 of the EP sites.
+    X : array_like
+        Covariates.
+    QS : tuple
+        Economic eigendecomposition of 𝙺.
+    """
+
+    def __init__(self, eta, tau, X, QS=None):
+        from numpy import asarray
+        from numpy_sugar.linalg import ddot
+
+        _GLMMNormal.__init__(self, eta, tau, X, QS)
+        Q0 = asarray(self._QS[0][0], float)
+        self._K = ddot(Q0, asarray(self._QS[1], float)) @ Q0.T
+
+    def __copy__(self):
+        from copy import deepcopy
+
+        from glimix_core.glmm._glmm import GLMM
+
+        gef = GLMMNormal(self.eta, self.tau, self._X, self._QS)
+        GLMM._copy_to(self, gef)
+        gef.__dict__["_cache"] = deepcopy(self._cache)
+        return gef
+
+    def get_fast_scanner(self):
+        """
+        Return :class:`glimix_core.lmm.FastScanner` for the current delta.
+        """
+        from glimix_core.lmm import FastScanner
+        from numpy_sugar.linalg import economic_qs, sum2diag
+
+        y = self.eta / self.tau
+        K = sum2diag(self.v0 * self._K, 1 / self.tau)
+        return FastScanner(y, self._X, economic_qs(K), self.v1)
+
+    def value(self):
+        """
+        Log of the marginal likelihood.
+        """
+        if self._cache["value"] is None:
+            self._evaluate()
+        return self._cache["value"]
+
+    def gradient(self):
+        """
+        Gradient of the log of the marginal likelihood.
+        """
+        if self._cache["grad"] is None:
+            self._evaluate()
+        return self._cache["grad"]
+
+    def _evaluate(self):
+        from numpy import einsum, exp, eye, log, pi, trace
+        from numpy.linalg import LinAlgError, inv, slogdet
+        from numpy_sugar.linalg import sum2diag
+        from scipy.linalg import cho_factor, cho_solve
+
+        scale = exp(self.logscale)
+        delta = 1 / (1 + exp(-self.logitdelta))
+        v0 = scale * (1 - delta)
+        v1 = scale * delta
+
+        K = self._K
+        A = sum2diag(sum2diag(v0 * K, v1), 1 / self.tau)
+        n = A.shape[0]
+
+        try:
+            L = cho_factor(A, lower=True, check_finite=False)
+        except LinAlgError:
+            # 𝚺 might not be positive definite for EP sites.
+            Ai = inv(A)
+            logdet = slogdet(A)[1]
+        else:
+            Ai = cho_solve(L, eye(n), check_finite=False)
+            logdet = 2 * log(L[0].diagonal()).sum()
+
+        m = self.eta / self.tau - self.mean()
+        Aim = Ai @ m
+
+        self._cache["value"] = (-n * log(2 * pi) - logdet - m @ Aim) / 2
+
+        # tr(𝙰⁻¹𝙺) and 𝐦ᵀ𝙰⁻¹𝙺𝙰⁻¹𝐦, from which the derivatives of 𝙰 with respect to
+        # the scale, (1 - 𝛿)𝙺 + 𝛿𝙸, and to delta, 𝑠(𝙸 - 𝙺), follow.
+        trAiK = einsum("ij,ij->", Ai, K)
+        trAi = trace(Ai)
+        AimKAim = Aim @ (K @ Aim)
+        AimAim = Aim @ Aim
+
+        g_scale = -((1 - delta) * trAiK + delta * trAi)
+        g_scale += (1 - delta) * AimKAim + delta * AimAim
+        g_delta = -scale * (trAi - trAiK) + scale * (AimAim - AimKAim)
+
+        ed = exp(-self.logitdelta)
+        self._cache["grad"] = {
+            "beta": Aim @ self._X,
+            "logscale": g_scale / 2 * scale,
+            "logitdelta": g_delta / 2 * (ed / (1 + ed)) / (1 + ed),
+        }
@@ -247,7 +247,8 @@ def _lmm(y, M, QS, verbose):
 
     lmm = LMM(y, M, QS, restricted=False)
     lmm.fit(verbose=verbose)
-    sys.stdout.flush()
+    if verbose:
+        sys.stdout.flush()
 
     if QS is None:
         v0 = None
@@ -267,7 +268,8 @@ def _glmm(y, lik, M, QS, verbose):
     glmm.fit(verbose=verbose)
     v0 = glmm.v0
     v1 = glmm.v1
-    sys.stdout.flush()
+    if verbose:
+        sys.stdout.flush()
 
     eta = glmm.site.eta
     tau = glmm.site.tau
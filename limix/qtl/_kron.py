@@ -0,0 +1,199 @@
+def eigh_kron(A, B):
+    """
+    Eigendecomposition of 𝙺 = 𝙰 ⊗ 𝙱 in terms of its factors.
+
+    The eigendecomposition of a Kronecker product is given by the eigendecomposition
+    of its factors: 𝙺 = (𝚄ₐ ⊗ 𝚄ᵦ)(𝚂ₐ ⊗ 𝚂ᵦ)(𝚄ₐ ⊗ 𝚄ᵦ)ᵀ. It therefore costs O(p³ + q³)
+    instead of O((pq)³) for p×p matrix 𝙰 and q×q matrix 𝙱.
+
+    Parameters
+    ----------
+    A : p×p array_like
+        Symmetric matrix.
+    B : q×q array_like
+        Symmetric matrix.
+
+    Returns
+    -------
+    Q : tuple
+        Eigenvectors ``(Ua, Ub)`` of the factors.
+    S : ndarray
+        Eigenvalues 𝚂ₐ ⊗ 𝚂ᵦ of 𝙺.
+    """
+    from numpy import asarray, kron
+    from numpy.linalg import eigh
+
+    SA, QA = eigh(asarray(A, float))
+    SB, QB = eigh(asarray(B, float))
+
+    return (QA, QB), kron(SA, SB)
+
+
+def economic_qs_kron(Q, S):
+    """
+    Economic eigendecomposition from the output of :func:`eigh_kron`.
+
+    Only the eigenvectors of the non-zero eigenvalues are formed, and directly from
+    the factors. The eigenvectors of the zero eigenvalues are not needed by the
+    models and are therefore given as an empty matrix.
+
+    Parameters
+    ----------
+    Q : tuple
+        Eigenvectors ``(Ua, Ub)`` of the factors.
+    S : ndarray
+        Eigenvalues of 𝙺.
+
+    Returns
+    -------
+    QS : tuple
+        ``((Q0, Q1), S0)``, as returned by :func:`numpy_sugar.linalg.economic_qs`.
+    """
+    from numpy import empty, flatnonzero
+
+    Q = KronOp(*Q)
+
+    ok = flatnonzero(S >= _epsilon())
+    return ((Q.columns(ok), empty((Q.shape[0], 0))), S[ok])
+
+
+class KronOp:
+    """
+    Linear operator 𝙰 ⊗ 𝙱 that never forms the Kronecker product.
+
+    Products use the identity (𝙰 ⊗ 𝙱)vec(𝚇ᵢ) = vec(𝙰𝚇ᵢ𝙱ᵀ) for each column of 𝚇,
+    replacing a large matrix-vector product by two small matrix-matrix ones. The
+    factors take O(pr + qs) memory instead of O(pqrs).
+
+    Parameters
+    ----------
+    A : p×r array_like
+        Left factor.
+    B : q×s array_like
+        Right factor.
+    """
+
+    def __init__(self, A, B):
+        from numpy import asarray
+
+        self._A = asarray(A, float)
+        self._B = asarray(B, float)
+
+    @property
+    def shape(self):
+        """
+        Shape (pq, rs) of the operator.
+        """
+        A, B = self._A, self._B
+        return (A.shape[0] * B.shape[0], A.shape[1] * B.shape[1])
+
+    @property
+    def T(self):
+        """
+        Transpose 𝙰ᵀ ⊗ 𝙱ᵀ.
+        """
+        return KronOp(self._A.T, self._B.T)
+
+    def columns(self, idx):
+        """
+        Dense matrix of the given columns of 𝙰 ⊗ 𝙱.
+
+        Parameters
+        ----------
+        idx : array_like
+            Column indices.
+
+        Returns
+        -------
+        ndarray
+            Selected columns.
+        """
+        from numpy import asarray
+
+        ia, ib = divmod(asarray(idx, int), self._B.shape[1])
+        C = self._A[:, None, ia] * self._B[None, :, ib]
+        return C.reshape((self.shape[0], -1))
+
+    def __matmul__(self, X):
+        """
+        Compute (𝙰 ⊗ 𝙱)𝚇 for a vector or matrix 𝚇 of rs rows.
+        """
+        from numpy import asarray, tensordot
+
+        A, B = self._A, self._B
+        X = asarray(X, float)
+        Y = X.reshape((A.shape[1], B.shape[1], -1))
+        Y = tensordot(A, Y, axes=1)
+        Y = B @ Y
+        return Y.reshape((self.shape[0],) + X.shape[1:])
+
+
+class KronB:
+    """
+    Solve (𝙺 + 𝑣𝙸)𝐱 = 𝐲 for 𝐱, where 𝙺 = 𝙰 ⊗ 𝙱.
+
+    It is a replacement for :class:`glimix_core.lmm._b.B` that keeps the eigenvectors
+    in factored form. We have 𝐱 = (𝚄ₐ ⊗ 𝚄ᵦ)𝙳⁻¹(𝚄ₐ ⊗ 𝚄ᵦ)ᵀ𝐲 for 𝙳 = 𝚂 + 𝑣𝙸, which
+    requires 𝑣 > 0.
+
+    Parameters
+    ----------
+    Q : tuple
+        Eigenvectors ``(Ua, Ub)`` of the factors.
+    S : ndarray
+        Eigenvalues of 𝙺.
+    v : float
+        Variance due to iid effect.
+    """
+
+    def __init__(self, Q, S, v):
+        self._Q = KronOp(*Q)
+        self._D = S + v
+
+    def dot(self, y):
+        """
+        Compute 𝐱.
+        """
+        Qty = self._Q.T @ y
+        if Qty.ndim == 1:
+            Qty /= self._D
+        else:
+            Qty /= self._D[:, None]
+        return self._Q @ Qty
+
+
+def kron_fast_scanner(lmm, Q, S):
+    """
+    Fast scanner of a fitted LMM whose covariance 𝙺 = 𝙰 ⊗ 𝙱.
+
+    Candidate rotations are performed using the factors of 𝙺. The dense scanner is
+    returned when the iid variance is zero.
+
+    Parameters
+    ----------
+    lmm : :class:`glimix_core.lmm.LMM`
+        Fitted model.
+    Q : tuple
+        Eigenvectors ``(Ua, Ub)`` of the factors.
+    S : ndarray
+        Eigenvalues of 𝙺.
+
+    Returns
+    -------
+    scanner : :class:`glimix_core.lmm.FastScanner`
+        Fast scanner.
+    """
+    from numpy import where
+    from numpy_sugar import epsilon
+
+    scanner = lmm.get_fast_scanner()
+    if lmm.v1 > epsilon.small:
+        S = where(S >= _epsilon(), S, 0.0)
+        scanner._B = KronB(Q, lmm.v0 * S, lmm.v1)
+    return scanner
+
+
+def _epsilon():
+    from numpy import finfo, sqrt
+
+    return sqrt(finfo(float).eps)
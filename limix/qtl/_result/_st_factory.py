@@ -4,7 +4,19 @@ from ._tuples import VariantResult, Result
 
 
 class STScanResultFactory:
-    def __init__(self, lik, trait, covariates, candidates, lml, beta, beta_se, v0, v1):
+    def __init__(
+        self,
+        lik,
+        trait,
+        covariates,
+        candidates,
+        lml,
+        beta,
+        beta_se,
+        v0,
+        v1,
+        null_params=None,
+    ):
         from numpy import asarray, atleast_1d
 
         self._h0 = STSimpleModelResult(
@@ -14,31 +26,72 @@ class STScanResultFactory:
         self._trait = str(trait)
         self._covariates = asarray(atleast_1d(covariates), str)
         self._candidates = asarray(atleast_1d(candidates), str)
+        self._null_params = null_params
 
     def add_test(self, cand_idx, h2):
-        from numpy import atleast_1d, asarray
+        from numpy import arange, atleast_1d, asarray
 
-        if not isinstance(cand_idx, slice):
-            cand_idx = asarray(atleast_1d(cand_idx).ravel(), int)
+        if isinstance(cand_idx, slice):
+            cand_idx = arange(len(self._candidates))[cand_idx]
+        cand_idx = asarray(atleast_1d(cand_idx).ravel(), int)
 
         def _1d_shape(x):
             x = asarray(x, float)
             x = atleast_1d(x.T).T
             return x
 
-        def _normalize(h):
-            return VariantResult(
-                lml=float(h.lml),
-                covariate_effsizes=_1d_shape(h.covariate_effsizes),
-                candidate_effsizes=_1d_shape(h.candidate_effsizes),
-                covariate_effsizes_se=_1d_shape(h.covariate_effsizes_se),
-                candidate_effsizes_se=_1d_shape(h.candidate_effsizes_se),
-                scale=float(h.scale),
-            )
+        h2 = VariantResult(
+            lml=[h2.lml],
+            covariate_effsizes=[_1d_shape(h2.covariate_effsizes)],
+            candidate_effsizes=[_1d_shape(h2.candidate_effsizes)],
+            covariate_effsizes_se=[_1d_shape(h2.covariate_effsizes_se)],
+            candidate_effsizes_se=[_1d_shape(h2.candidate_effsizes_se)],
+            scale=[h2.scale],
+        )
+        self.add_tests(cand_idx[None, :], h2)
+
+    def add_tests(self, cand_idx, h2):
+        """
+        Add several tests at once.
+
+        Parameters
+        ----------
+        cand_idx : array_like
+            Candidate indices, one row per test.
+        h2 : VariantResult
+            Results stacked along the first axis, one entry per test.
+        """
+        from numpy import asarray
+
+        cand_idx = asarray(cand_idx, int)
+        ntests = cand_idx.shape[0]
+        if ntests == 0:
+            return
+        cand_idx = cand_idx.reshape((ntests, -1))
+
+        def _2d_shape(x, ncols):
+            return asarray(x, float).reshape((ntests, ncols))
+
+        ncovariates = len(self._covariates)
+        ncandidates = cand_idx.shape[1]
+
+        h2 = VariantResult(
+            lml=asarray(h2.lml, float).reshape(ntests),
+            covariate_effsizes=_2d_shape(h2.covariate_effsizes, ncovariates),
+            candidate_effsizes=_2d_shape(h2.candidate_effsizes, ncandidates),
+            covariate_effsizes_se=_2d_shape(h2.covariate_effsizes_se, ncovariates),
+            candidate_effsizes_se=_2d_shape(h2.candidate_effsizes_se, ncandidates),
+            scale=asarray(h2.scale, float).reshape(ntests),
+        )
 
-        self._tests.append(Result(idx=cand_idx, h1=None, h2=_normalize(h2)))
+        self._tests.append(Result(idx=cand_idx, h1=None, h2=h2))
 
     def create(self):
         return STScanResult(
-            self._tests, self._trait, self._covariates, self._candidates, self._h0
+            self._tests,
+            self._trait,
+            self._covariates,
+            self._candidates,
+            self._h0,
+            self._null_params,
         )
@@ -6,12 +6,13 @@ from ._draw import draw_alt_hyp_table, draw_lrt_table, draw_model
 
 
 class STScanResult:
-    def __init__(self, tests, trait, covariates, candidates, h0):
+    def __init__(self, tests, trait, covariates, candidates, h0, null_params=None):
         self._tests = tests
         self._trait = trait
         self._covariates = covariates
         self._candidates = candidates
         self._h0 = h0
+        self._null_params = null_params
 
     @property
     def stats(self):
@@ -34,6 +35,18 @@ class STScanResult:
         """
         return self._h0
 
+    @property
+    def null_params(self):
+        """
+        Fitted parameters of the null model.
+
+        Dictionary of effect sizes ``"beta"`` and variances ``"v0"`` and ``"v1"``. The
+        site parameters ``"eta"`` and ``"tau"`` of the normal approximation are also
+        given for non-normal likelihoods. It can be passed as ``init_params`` to
+        :func:`limix.qtl.scan` to warm-start the next fit.
+        """
+        return self._null_params
+
     @property
     def _h0_dataframe(self):
         from pandas import DataFrame
@@ -51,29 +64,36 @@ class STScanResult:
 
     @property
     def _h2_dataframe(self):
-        from pandas import DataFrame
+        from numpy import arange, concatenate, empty, full, repeat, tile
+        from pandas import DataFrame, concat
 
-        covariates = list(self._covariates)
+        covariates = self._covariates.astype(object)
 
         h2 = []
-        for i, test in enumerate(self._tests):
-            candidates = list(self._candidates[test.idx])
-
-            effsizes = test.h2.covariate_effsizes
-            effsizes_se = test.h2.covariate_effsizes_se
-            for l, c in enumerate(covariates):
-                eff = effsizes[l]
-                eff_se = effsizes_se[l]
-                v = [i, self._trait, "covariate", str(c), eff, eff_se]
-                h2.append(v)
-
-            effsizes = test.h2.candidate_effsizes
-            effsizes_se = test.h2.candidate_effsizes_se
-            for l, c in enumerate(candidates):
-                eff = effsizes[l]
-                eff_se = effsizes_se[l]
-                v = [i, self._trait, "candidate", str(c), eff, eff_se]
-                h2.append(v)
+        offset = 0
+        for test in self._tests:
+            ntests, ncandidates = test.idx.shape
+            ncols = len(covariates) + ncandidates
+
+            names = empty((ntests, ncols), object)
+            names[:, : len(covariates)] = covariates
+            names[:, len(covariates) :] = self._candidates[test.idx]
+
+            effect_type = ["covariate"] * len(covariates) + ["candidate"] * ncandidates
+
+            effsizes = [test.h2.covariate_effsizes, test.h2.candidate_effsizes]
+            effsizes_se = [test.h2.covariate_effsizes_se, test.h2.candidate_effsizes_se]
+
+            df = {
+                "test": repeat(offset + arange(ntests), ncols),
+                "trait": full(ntests * ncols, self._trait, object),
+                "effect_type": tile(effect_type, ntests).astype(object),
+                "effect_name": names.ravel(),
+                "effsize": concatenate(effsizes, axis=1).ravel(),
+                "effsize_se": concatenate(effsizes_se, axis=1).ravel(),
+            }
+            h2.append(DataFrame(df))
+            offset += ntests
 
         columns = [
             "test",
@@ -83,19 +103,32 @@ class STScanResult:
             "effsize",
             "effsize_se",
         ]
-        return DataFrame(h2, columns=columns)
+        if len(h2) == 0:
+            return DataFrame([], columns=columns)
+        return concat(h2, ignore_index=True)
 
     @property
     def _stats_dataframe(self):
+        from numpy import arange, concatenate, full
         from pandas import DataFrame
 
-        stats = []
-        for i, test in enumerate(self._tests):
-            dof20 = test.h2.candidate_effsizes.size
-            stats.append([i, self._h0.lml, test.h2.lml, dof20, test.h2.scale])
+        lml2 = [test.h2.lml for test in self._tests]
+        scale2 = [test.h2.scale for test in self._tests]
+        dof20 = [full(test.idx.shape[0], test.idx.shape[1]) for test in self._tests]
 
         columns = ["test", "lml0", "lml2", "dof20", "scale2"]
-        stats = DataFrame(stats, columns=columns)
+        if len(self._tests) == 0:
+            stats = DataFrame([], columns=columns)
+        else:
+            lml2 = concatenate(lml2)
+            stats = {
+                "test": arange(len(lml2)),
+                "lml0": full(len(lml2), self._h0.lml),
+                "lml2": lml2,
+                "dof20": concatenate(dof20),
+                "scale2": concatenate(scale2),
+            }
+            stats = DataFrame(stats, columns=columns)
 
         stats["pv20"] = lrt_pvalues(stats["lml0"], stats["lml2"], stats["dof20"])
 
@@ -4,12 +4,38 @@ from limix._display import session_line
 
 from .._data import asarray as _asarray, conform_dataset, normalize_likelihood
 from .._display import session_block
-from ._assert import assert_finite
+from ._assert import assert_finite, is_all_finite
+from ._cache import digest, memoize
+from ._fast_scan import fast_scan
+from ._kron import economic_qs_kron, eigh_kron, kron_fast_scanner
 from ._result import MTScanResultFactory, STScanResultFactory
 
+# Largest ratio between site precisions for which the normal approximation of a
+# GLMM is not refitted.
+_TAU_RATIO = 1.05
+
+# Smallest distance of the initial ratio between variances of a GLMM to 0 and 1.
+_DELTA_MARGIN = 0.01
+
 
 def scan(
-    G, Y, lik="normal", K=None, M=None, idx=None, A=None, A0=None, A1=None, verbose=True
+    G,
+    Y,
+    lik="normal",
+    K=None,
+    M=None,
+    idx=None,
+    A=None,
+    A0=None,
+    A1=None,
+    verbose=True,
+    *,
+    K_kron=None,
+    low_rank=None,
+    cache=False,
+    init_params=None,
+    assume_aligned=False,
+    precision="double",
 ):
     """
     Multi-trait association and interaction testing via linear mixed models.
@@ -87,6 +113,40 @@ def scan(
         matrix, p₀=p. Defaults to ``None``.
     verbose : bool, optional
         ``True`` to display progress and summary; ``False`` otherwise.
+    K_kron : tuple, optional
+        Pair ``(K_A, K_B)`` of symmetric matrices defining the sample covariance
+        K = K_A ⊗ K_B. Its eigendecomposition is computed from the factors, which is
+        much cheaper than decomposing K. Samples are assumed to be in the same order
+        as the Kronecker product. It cannot be used together with ``K``. Defaults to
+        ``None``.
+    low_rank : int, optional
+        Number r of leading eigenpairs of ``K`` to be computed. The remaining
+        eigenvalues are taken as zero, which is a good approximation for kinship
+        matrices estimated from fewer variants than samples or dominated by a few
+        components. It reduces the cost of the eigendecomposition from O(n³) to
+        roughly O(n²r). Defaults to ``None``, for the full eigendecomposition.
+    cache : bool, optional
+        ``True`` to reuse the null model fitted by a previous call with the same
+        outcome, covariates, likelihood, and sample covariance. This avoids refitting
+        it when candidates are scanned in chunks. At most eight entries are kept,
+        each being either an eigendecomposition or a null model, so that the data of
+        four distinct scans fit in it; see :func:`limix.qtl.clear_cache` to release
+        them. Defaults to ``False``.
+    init_params : dict, optional
+        Initial values of the null model parameters for non-normal likelihoods,
+        usually ``result.null_params`` of a previous scan over the same outcome.
+        Keys ``"beta"``, ``"v0"``, and ``"v1"`` are used; the variances must be
+        non-negative. Starting from a nearby solution greatly reduces the number of
+        iterations when candidates are scanned in chunks. Defaults to ``None``.
+    assume_aligned : bool, optional
+        ``True`` if the samples of all arrays are the same and in the same order,
+        which skips sample matching. See :func:`limix._data.conform_dataset`.
+        Defaults to ``False``.
+    precision : "double", "single", optional
+        Floating-point precision of the rotation of the candidates, the most
+        expensive step of a single-trait scan over all candidates. ``"single"``
+        roughly halves its cost, but p-values are then accurate to about five
+        significant digits only. Defaults to ``"double"``.
 
     Returns
     -------
@@ -277,18 +337,25 @@ def scan(
     It will raise a ``ValueError`` exception if non-finite values are passed. Please,
     refer to the :func:`limix.qc.mean_impute` function for missing value imputation.
     """
-    from numpy_sugar.linalg import economic_qs
-
     lik = normalize_likelihood(lik)
 
     if A is None:
         if A0 is not None or A1 is not None:
             raise ValueError("You cannot define `A0` or `A1` without defining `A`.")
 
+    if precision not in ("double", "single"):
+        raise ValueError("`precision` must be either 'double' or 'single'.")
+
+    if K is not None and K_kron is not None:
+        raise ValueError("You cannot define both `K` and `K_kron`.")
+
+    if low_rank is not None and K is None:
+        raise ValueError("You cannot define `low_rank` without defining `K`.")
+
     with session_block("QTL analysis", disable=not verbose):
 
         with session_line("Normalising input... ", disable=not verbose):
-            data = conform_dataset(Y, M, G=G, K=K)
+            data = conform_dataset(Y, M, G=G, K=K, assume_aligned=assume_aligned)
 
         Y = data["y"]
         M = data["M"]
@@ -296,19 +363,32 @@ def scan(
         K = data["K"]
 
         assert_finite(Y, M, K)
-
-        if K is not None:
-            QS = economic_qs(K)
+        for k in K_kron or ():
+            if not is_all_finite(k):
+                raise ValueError("Covariate matrix must have finite values only.")
+
+        if cache:
+            key = (digest(K, *(K_kron or ())), low_rank)
+            QS, K_kron = memoize(
+                ("QS", key), lambda: _economic_qs(K, K_kron, low_rank)
+            )
+            key = ("null", key, digest(Y, M, *lik))
         else:
-            QS = None
+            key = None
+            QS, K_kron = _economic_qs(K, K_kron, low_rank)
+
+        if K_kron is not None and QS[0][0].shape[0] != Y.shape[0]:
+            raise ValueError("The size of `K_kron` differs from the number of samples.")
 
         if verbose:
             print()
-            _print_input_info(idx, lik, Y, M, G, K)
+            _print_input_info(idx, lik, Y, M, G, QS)
             print()
 
         if A is None:
-            r = _single_trait_scan(idx, lik, Y, M, G, QS, verbose)
+            r = _single_trait_scan(
+                idx, lik, Y, M, G, QS, K_kron, init_params, key, precision, verbose
+            )
         else:
             r = _multi_trait_scan(idx, lik, Y, M, G, QS, A, A0, A1, verbose)
 
@@ -320,7 +400,47 @@ def scan(
         return r
 
 
-def _print_input_info(idx, lik, Y, M, G, K):
+def _economic_qs(K, K_kron, low_rank):
+    from numpy_sugar.linalg import economic_qs
+
+    if K is not None:
+        if low_rank is None:
+            return economic_qs(K), None
+        return _economic_qs_low_rank(K, low_rank), None
+
+    if K_kron is not None:
+        K_kron = eigh_kron(*K_kron)
+        return economic_qs_kron(*K_kron), K_kron
+
+    return None, None
+
+
+def _economic_qs_low_rank(K, r):
+    """
+    Economic eigendecomposition of 𝙺 restricted to its r largest eigenvalues.
+
+    Only the leading eigenpairs are computed by LAPACK. The eigenvectors of the
+    remaining eigenvalues are not needed by the models and are therefore given as an
+    empty matrix.
+    """
+    from numpy import asarray, empty, finfo, sqrt
+    from scipy.linalg import eigh
+
+    K = asarray(K, float)
+    n = K.shape[0]
+    if not 0 < r <= n:
+        raise ValueError(f"`low_rank` must be between 1 and {n}.")
+
+    try:
+        S, Q = eigh(K, subset_by_index=[n - r, n - 1])
+    except TypeError:
+        # SciPy < 1.5
+        S, Q = eigh(K, eigvals=(n - r, n - 1))
+    ok = S >= sqrt(finfo(float).eps)
+    return ((Q[:, ok], empty((n, 0))), S[ok])
+
+
+def _print_input_info(idx, lik, Y, M, G, QS):
     from limix._display import draw_list
     from limix._display import AlignedText, draw_title
 
@@ -344,7 +464,7 @@ def _print_input_info(idx, lik, Y, M, G, K):
         ncandidates = len(idx)
     aligned.add_item("N. of candidates", ncandidates)
 
-    if K is None:
+    if QS is None:
         kinship_presence = "absent"
     else:
         kinship_presence = "present"
@@ -354,15 +474,27 @@ def _print_input_info(idx, lik, Y, M, G, K):
     print(aligned.draw())
 
 
-def _single_trait_scan(idx, lik, Y, M, G, QS, verbose):
-    from numpy import asarray
+def _single_trait_scan(
+    idx, lik, Y, M, G, QS, K_kron, init_params, key, precision, verbose
+):
+    from copy import copy
+    from numpy import arange, asarray, ascontiguousarray
     from tqdm import tqdm
 
-    if lik[0] == "normal":
-        scanner, v0, v1 = _st_lmm(Y.values.ravel(), M.values, QS, verbose)
+    def fit():
+        # Contiguous views, if possible, shared by every model fitted below.
+        y = ascontiguousarray(Y.values, float).reshape(-1)
+        X = ascontiguousarray(M.values, float)
+        if lik[0] == "normal":
+            return _st_lmm(y, X, QS, K_kron, verbose)
+        return _st_glmm(y, lik, X, QS, init_params, verbose)
+
+    if key is None:
+        scanner, v0, v1, null_params = fit()
     else:
-        scanner, v0, v1 = _st_glmm(Y.values.ravel(), lik, M.values, QS, verbose)
-    pass
+        scanner, v0, v1, null_params = memoize(key, fit)
+        # Results must not share the cached parameters.
+        null_params = {k: copy(v) for k, v in null_params.items()}
 
     r = STScanResultFactory(
         lik[0],
@@ -374,13 +506,12 @@ def _single_trait_scan(idx, lik, Y, M, G, QS, verbose):
         scanner.null_beta_se,
         v0,
         v1,
+        null_params,
     )
 
     if idx is None:
-        r1 = scanner.fast_scan(G, verbose)
-        for i in tqdm(range(G.shape[1]), "Results", disable=not verbose):
-            h2 = _normalise_scan_names({k: v[i] for k, v in r1.items()})
-            r.add_test(i, h2)
+        r1 = fast_scan(scanner, G, precision, verbose)
+        r.add_tests(arange(G.shape[1]), _normalise_scan_names(r1))
     else:
         for i in tqdm(idx, "Results", disable=not verbose):
             i = _2d_sel(i)
@@ -454,13 +585,14 @@ def _multi_trait_scan(idx, lik, Y, M, G, QS, A, A0, A1, verbose):
     return r
 
 
-def _st_lmm(Y, M, QS, verbose):
+def _st_lmm(Y, M, QS, K_kron, verbose):
     from numpy import nan
     from glimix_core.lmm import LMM
 
     lmm = LMM(Y, M, QS, restricted=False)
     lmm.fit(verbose=verbose)
-    sys.stdout.flush()
+    if verbose:
+        sys.stdout.flush()
 
     if QS is None:
         v0 = nan
@@ -469,15 +601,24 @@ def _st_lmm(Y, M, QS, verbose):
 
     v1 = lmm.v1
 
-    return lmm.get_fast_scanner(), v0, v1
+    if K_kron is None:
+        scanner = lmm.get_fast_scanner()
+    else:
+        scanner = kron_fast_scanner(lmm, *K_kron)
 
+    return scanner, v0, v1, dict(beta=lmm.beta.copy(), v0=v0, v1=v1)
 
-def _st_glmm(y, lik, M, QS, verbose):
+
+def _st_glmm(y, lik, M, QS, init_params, verbose):
     from numpy import nan
-    from glimix_core.glmm import GLMMExpFam, GLMMNormal
+    from glimix_core.glmm import GLMMExpFam
+    from ._glmm import GLMMNormal
 
     glmm = GLMMExpFam(y, lik, M, QS)
 
+    if init_params is not None:
+        _set_glmm_params(glmm, lik, QS, init_params)
+
     glmm.fit(verbose=verbose)
 
     if QS is None:
@@ -486,15 +627,67 @@ def _st_glmm(y, lik, M, QS, verbose):
         v0 = glmm.v0
 
     v1 = glmm.v1
-    sys.stdout.flush()
+    if verbose:
+        sys.stdout.flush()
 
     eta = glmm.site.eta
     tau = glmm.site.tau
 
+    # The normal approximation has its optimum at, or very close to, the parameters
+    # of the EP fit, which are therefore used as initial point. Its fit is skipped
+    # altogether when the site precisions are practically constant.
     gnormal = GLMMNormal(eta, tau, M, QS)
-    gnormal.fit(verbose=verbose)
+    gnormal.beta = glmm.beta
+    gnormal.scale = glmm.scale
+    gnormal.delta = glmm.delta
+    if not (tau.min() > 0 and tau.max() < _TAU_RATIO * tau.min()):
+        gnormal.fit(verbose=verbose)
+    scanner = gnormal.get_fast_scanner()
+
+    null_params = dict(
+        beta=glmm.beta.copy(), v0=v0, v1=v1, eta=eta.copy(), tau=tau.copy()
+    )
+    return scanner, v0, v1, null_params
+
+
+def _set_glmm_params(glmm, lik, QS, params):
+    """
+    Set the initial point of the GLMM from the parameters of a previous fit.
+
+    We have 𝑣₀ = 𝑠(1 - 𝛿) and 𝑣₁ = 𝑠𝛿. The ratio 𝛿 is kept as it is when it cannot be
+    recovered from 𝑣₀ and 𝑣₁: it is fixed for the Probit likelihood and 𝑣₀ is
+    undefined in the absence of 𝙺. Otherwise, it is kept away from 0 and 1 so that
+    the fit does not start at a boundary.
+    """
+    from numpy import all, asarray, clip, isfinite, isnan
+
+    beta = asarray(params["beta"], float)
+    v0 = float(params["v0"])
+    v1 = float(params["v1"])
+
+    if beta.shape != glmm.beta.shape or not all(isfinite(beta)):
+        raise ValueError("`init_params['beta']` must be finite, one per covariate.")
+
+    if not (isfinite(v1) and v1 >= 0):
+        raise ValueError("`init_params['v1']` must be finite and non-negative.")
+
+    # 𝑣₀ is nan for a model fitted without 𝙺.
+    if not (isnan(v0) or (isfinite(v0) and v0 >= 0)):
+        raise ValueError("`init_params['v0']` must be finite and non-negative.")
+
+    glmm.beta = beta
+
+    if QS is None:
+        if glmm.delta > 0 and v1 > 0:
+            glmm.scale = v1 / glmm.delta
+        return
+
+    if isnan(v0) or v0 + v1 <= 0:
+        return
 
-    return gnormal.get_fast_scanner(), v0, v1
+    glmm.scale = v0 + v1
+    if lik[0] != "probit":
+        glmm.delta = clip(v1 / (v0 + v1), _DELTA_MARGIN, 1 - _DELTA_MARGIN)
 
 
 def _mt_lmm(Y, A, M, QS, verbose):
@@ -509,7 +702,8 @@ def _mt_lmm(Y, A, M, QS, verbose):
 
     lmm = Kron2Sum(Y.values, A, M.values, KG, restricted=False)
     lmm.fit(verbose=verbose)
-    sys.stdout.flush()
+    if verbose:
+        sys.stdout.flush()
 
     C0 = lmm.C0
     C1 = lmm.C1
@@ -0,0 +1,37 @@
+from glimix_core.glmm import GLMMNormal as _GLMMNormal
+from numpy.random import RandomState
+from numpy.testing import assert_allclose
+from numpy_sugar.linalg import economic_qs
+
+from limix.qtl._glmm import GLMMNormal
+
+
+def test_qtl_glmm_normal():
+    random = RandomState(0)
+    n = 50
+
+    X = random.randn(n, 2)
+    G = random.randn(n, 10)
+    QS = economic_qs(G @ G.T / 10)
+    eta = random.randn(n)
+    tau = random.rand(n) + 0.5
+
+    for QS in [QS, None]:
+        g0 = _GLMMNormal(eta, tau, X, QS)
+        g1 = GLMMNormal(eta, tau, X, QS)
+        for g in [g0, g1]:
+            g.beta = [0.1, -0.2]
+            g.scale = 1.3
+            g.delta = 0.3
+
+        assert_allclose(g0.value(), g1.value())
+        for k, v in g0.gradient().items():
+            assert_allclose(v, g1.gradient()[k])
+
+        g0.fit(verbose=False)
+        g1.fit(verbose=False)
+        assert_allclose(g0.lml(), g1.lml(), rtol=1e-6)
+        assert_allclose(g0.beta, g1.beta, rtol=1e-5, atol=1e-7)
+        assert_allclose(
+            g0.get_fast_scanner().null_lml(), g1.get_fast_scanner().null_lml()
+        )
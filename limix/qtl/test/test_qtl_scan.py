@@ -5,21 +5,24 @@ from numpy import (
     argmin,
     array,
     concatenate,
+    diag,
     dot,
     exp,
     eye,
+    full,
     kron,
     nan,
     reshape,
     sqrt,
     zeros,
 )
+from numpy.linalg import inv
 from numpy.random import RandomState
 from numpy.testing import assert_allclose, assert_array_equal
 from pandas import DataFrame
 
 from limix.qc import normalise_covariance
-from limix.qtl import scan
+from limix.qtl import clear_cache, scan
 from limix.stats import linear_kinship, multivariate_normal as mvn
 
 
@@ -211,6 +214,9 @@ def test_qtl_scan_lmm():
     pv = result.stats["pv20"]
     assert_allclose(pv[ix_best_snp], 1.0, atol=1e-6)
 
+    result = scan(X, y, "normal", K, M, None, None, None, None, False)
+    assert_allclose(result.stats["pv20"], pv)
+
 
 def test_qtl_scan_lmm_nokinship():
     random = RandomState(0)
@@ -229,6 +235,204 @@ def test_qtl_scan_lmm_nokinship():
     assert_allclose(pv[:2], [8.159539103135342e-05, 0.10807353641893498], atol=1e-5)
 
 
+def test_qtl_scan_lmm_fast_scan():
+    random = RandomState(0)
+    nsamples = 50
+
+    G = random.randn(nsamples, 100)
+    K = linear_kinship(G[:, 0:80], verbose=False)
+
+    y = dot(G, random.randn(100)) / sqrt(100) + 0.2 * random.randn(nsamples)
+
+    M = G[:, :5]
+    X = G[:, 60:70]
+
+    r0 = scan(X, y, "normal", K, M=M, verbose=False)
+    r1 = scan(X, y, "normal", K, M=M, idx=list(range(10)), verbose=False)
+    assert_allclose(r0.stats["pv20"], r1.stats["pv20"], rtol=1e-6)
+    e0 = r0.effsizes["h2"]
+    e1 = r1.effsizes["h2"]
+    assert_allclose(e0["effsize"], e1["effsize"], rtol=1e-6)
+    assert_allclose(e0["effsize_se"], e1["effsize_se"], rtol=1e-6)
+
+
+def test_qtl_scan_lmm_effsizes_se():
+    random = RandomState(0)
+    nsamples = 50
+
+    G = random.randn(nsamples, 100)
+    K = linear_kinship(G[:, 0:80], verbose=False)
+
+    y = dot(G, random.randn(100)) / sqrt(100) + 0.2 * random.randn(nsamples)
+
+    M = G[:, :5]
+    X = G[:, 68:72]
+
+    r = scan(X, y, "normal", K, M=M, verbose=False)
+    v0 = r.h0.variances["fore_covariance"].item()
+    v1 = r.h0.variances["back_covariance"].item()
+    Ki = inv(v0 * K + v1 * eye(nsamples))
+
+    # se = √(s⋅diag((𝚇ᵀ𝙺⁻¹𝚇)⁻¹)) for 𝚇 = [𝙼 𝐠], covariates included.
+    h2 = r.effsizes["h2"]
+    for i in range(X.shape[1]):
+        Xi = concatenate((M, X[:, [i]]), axis=1)
+        scale = r.stats["scale2"][i]
+        se = sqrt(scale * diag(inv(Xi.T @ Ki @ Xi)))
+        assert_allclose(h2[h2["test"] == i]["effsize_se"], se, rtol=1e-5)
+
+    se = [0.10790423, 0.13877111, 0.12677963, 0.12215234, 0.13105184, 0.11079334]
+    assert_allclose(h2[h2["test"] == 0]["effsize_se"], se, rtol=1e-5)
+
+
+def test_qtl_scan_lmm_fast_scan_numpy_kernel(monkeypatch):
+    import limix.qtl._fast_scan
+
+    random = RandomState(0)
+    nsamples = 50
+
+    G = random.randn(nsamples, 100)
+    K = linear_kinship(G[:, 0:80], verbose=False)
+
+    y = dot(G, random.randn(100)) / sqrt(100) + 0.2 * random.randn(nsamples)
+
+    M = G[:, :5]
+    X = G[:, 60:70]
+
+    r0 = scan(X, y, "normal", K, M=M, verbose=False)
+    monkeypatch.setattr(limix.qtl._fast_scan, "_get_kernel", lambda: None)
+    r1 = scan(X, y, "normal", K, M=M, verbose=False)
+    assert_allclose(r0.stats["pv20"], r1.stats["pv20"], rtol=1e-6)
+    e0 = r0.effsizes["h2"]
+    e1 = r1.effsizes["h2"]
+    assert_allclose(e0["effsize"], e1["effsize"], rtol=1e-6)
+    assert_allclose(e0["effsize_se"], e1["effsize_se"], rtol=1e-6)
+
+
+def test_qtl_scan_lmm_fast_scan_float32():
+    random = RandomState(0)
+    nsamples = 50
+
+    G = random.binomial(2, 0.3, (nsamples, 100)).astype("float32")
+    K = linear_kinship(G[:, 0:80], verbose=False)
+
+    y = dot(G, random.randn(100)) / sqrt(100) + 0.2 * random.randn(nsamples)
+
+    M = random.randn(nsamples, 2)
+    X = G[:, 60:70]
+
+    r0 = scan(X.astype(float), y, "normal", K, M=M, verbose=False)
+    r1 = scan(X, y, "normal", K, M=M, verbose=False)
+    assert_allclose(r0.stats["pv20"], r1.stats["pv20"], rtol=1e-6)
+
+    # Single precision is only accurate to about five significant digits.
+    r1 = scan(X, y, "normal", K, M=M, precision="single", verbose=False)
+    assert_allclose(r0.stats["pv20"], r1.stats["pv20"], rtol=1e-4)
+
+    with pytest.raises(ValueError):
+        scan(X, y, "normal", K, M=M, precision="half", verbose=False)
+
+
+def test_qtl_scan_lmm_cache():
+    random = RandomState(0)
+    nsamples = 50
+
+    G = random.randn(nsamples, 100)
+    K = linear_kinship(G[:, 0:80], verbose=False)
+
+    y = dot(G, random.randn(100)) / sqrt(100) + 0.2 * random.randn(nsamples)
+
+    M = G[:, :5]
+    X = G[:, 60:70]
+
+    r = scan(X, y, "normal", K, M=M, verbose=False)
+    r0 = scan(X[:, :5], y, "normal", K, M=M, cache=True, verbose=False)
+    r1 = scan(X[:, 5:], y, "normal", K, M=M, cache=True, verbose=False)
+    pv = concatenate((r0.stats["pv20"], r1.stats["pv20"]))
+    assert_allclose(r.stats["pv20"], pv, rtol=1e-6)
+
+    y[0] += 1.0
+    r1 = scan(X[:, 5:], y, "normal", K, M=M, cache=True, verbose=False)
+    r = scan(X[:, 5:], y, "normal", K, M=M, verbose=False)
+    assert_allclose(r.stats["pv20"], r1.stats["pv20"], rtol=1e-6)
+
+    r0 = scan(X[:, :5], y, "normal", K, M=M, cache=True, verbose=False)
+    assert r0.null_params is not r1.null_params
+    r0.null_params["beta"][:] = 0.0
+    assert_allclose(r1.null_params["beta"], r.null_params["beta"])
+
+    clear_cache()
+    r1 = scan(X[:, 5:], y, "normal", K, M=M, cache=True, verbose=False)
+    assert_allclose(r1.null_params["beta"], r.null_params["beta"])
+
+
+def test_qtl_scan_lmm_kron():
+    random = RandomState(0)
+    nsamples = 50
+
+    G = random.randn(nsamples, 100)
+    KA = linear_kinship(random.randn(5, 10), verbose=False)
+    KB = linear_kinship(random.randn(10, 20), verbose=False)
+    K = kron(KA, KB)
+
+    y = dot(G, random.randn(100)) / sqrt(100) + 0.2 * random.randn(nsamples)
+
+    M = G[:, :5]
+    X = G[:, 68:70]
+
+    r0 = scan(X, y, "normal", K, M=M, verbose=False)
+    r1 = scan(X, y, "normal", M=M, K_kron=(KA, KB), verbose=False)
+    assert_allclose(r0.stats["pv20"], r1.stats["pv20"], rtol=1e-5)
+
+    r0 = scan(X, y, "normal", K, M=M, idx=[0, [1]], verbose=False)
+    r1 = scan(X, y, "normal", M=M, idx=[0, [1]], K_kron=(KA, KB), verbose=False)
+    assert_allclose(r0.stats["pv20"], r1.stats["pv20"], rtol=1e-5)
+
+    with pytest.raises(ValueError):
+        scan(X, y, "normal", K, M=M, K_kron=(KA, KB), verbose=False)
+
+    KA[0, 0] = nan
+    with pytest.raises(ValueError):
+        scan(X, y, "normal", M=M, K_kron=(KA, KB), verbose=False)
+
+
+def test_qtl_scan_lmm_assume_aligned():
+    random = RandomState(0)
+    nsamples = 50
+
+    G = random.randn(nsamples, 100)
+    K = linear_kinship(G[:, 0:80], verbose=False)
+
+    y = dot(G, random.randn(100)) / sqrt(100) + 0.2 * random.randn(nsamples)
+
+    M = G[:, :5]
+    X = G[:, 60:70]
+
+    r0 = scan(X, y, "normal", K, M=M, verbose=False)
+    r1 = scan(X, y, "normal", K, M=M, assume_aligned=True, verbose=False)
+    assert_allclose(r0.stats["pv20"], r1.stats["pv20"], rtol=1e-6)
+
+
+def test_qtl_scan_lmm_low_rank():
+    random = RandomState(0)
+    nsamples = 50
+
+    G = random.randn(nsamples, 100)
+    K = dot(G[:, :10], G[:, :10].T) / 10
+
+    y = dot(G, random.randn(100)) / sqrt(100) + 0.2 * random.randn(nsamples)
+
+    M = G[:, 20:25]
+    X = G[:, 60:70]
+
+    r0 = scan(X, y, "normal", K, M=M, verbose=False)
+    r1 = scan(X, y, "normal", K, M=M, low_rank=10, verbose=False)
+    assert_allclose(r0.stats["pv20"], r1.stats["pv20"], rtol=1e-5)
+
+    with pytest.raises(ValueError):
+        scan(X, y, "normal", K, M=M, low_rank=nsamples + 1, verbose=False)
+
+
 def test_qtl_scan_lmm_repeat_samples_by_index():
     random = RandomState(0)
     nsamples = 30
@@ -320,6 +524,84 @@ def test_qtl_scan_glmm_binomial():
     assert_allclose(pv, [0.9315770010211236, 0.8457015828837173], atol=1e-6, rtol=1e-6)
 
 
+def test_qtl_scan_glmm_binomial_init_params():
+    random = RandomState(0)
+    nsamples = 25
+
+    X = random.randn(nsamples, 2)
+    G = random.randn(nsamples, 100)
+    K = dot(G, G.T)
+    ntrials = random.randint(1, 100, nsamples)
+    z = dot(G, random.randn(100)) / sqrt(100)
+
+    successes = zeros(len(ntrials), int)
+    for i, nt in enumerate(ntrials):
+        for _ in range(nt):
+            successes[i] += int(z[i] + 0.5 * random.randn() > 0)
+
+    lik = ("binomial", ntrials)
+    r0 = scan(X[:, :1], successes, lik, K, verbose=False)
+    assert sorted(r0.null_params) == ["beta", "eta", "tau", "v0", "v1"]
+
+    r1 = scan(X[:, 1:], successes, lik, K, init_params=r0.null_params, verbose=False)
+    assert_allclose(r1.stats["pv20"], [0.8457015828837173], atol=1e-5, rtol=1e-5)
+    assert_allclose(r1.null_params["beta"], r0.null_params["beta"], rtol=1e-4)
+
+
+def test_qtl_scan_glmm_bernoulli_init_params():
+    random = RandomState(0)
+    nsamples = 100
+
+    G = random.randn(nsamples, 100)
+    K = dot(G, G.T) / 100
+    z = dot(G, random.randn(100)) / sqrt(100)
+    y = (z + 0.5 * random.randn(nsamples) > 0).astype(float)
+    X = random.randn(nsamples, 3)
+    X[:, 0] += 0.5 * z
+
+    r = scan(X, y, "bernoulli", K, verbose=False)
+
+    # 𝑣₀ is undefined without 𝙺, so the default starting point is used instead.
+    r0 = scan(X, y, "bernoulli", verbose=False)
+    r1 = scan(X, y, "bernoulli", K, init_params=r0.null_params, verbose=False)
+    assert_allclose(r1.stats["pv20"], r.stats["pv20"], rtol=1e-4)
+
+    params = dict(r.null_params, v0=0.0)
+    r1 = scan(X, y, "bernoulli", K, init_params=params, verbose=False)
+    assert_allclose(r1.stats["pv20"], r.stats["pv20"], rtol=0.1)
+
+    with pytest.raises(ValueError):
+        params = dict(r.null_params, v1=-1.0)
+        scan(X, y, "bernoulli", K, init_params=params, verbose=False)
+
+    with pytest.raises(ValueError):
+        params = dict(r.null_params, beta=full(3, nan))
+        scan(X, y, "bernoulli", K, init_params=params, verbose=False)
+
+
+def test_qtl_scan_glmm_binomial_constant_tau(monkeypatch):
+    import limix.qtl._scan
+
+    random = RandomState(0)
+    nsamples = 100
+
+    G = random.randn(nsamples, 50)
+    K = dot(G, G.T) / 50
+    X = random.randn(nsamples, 3)
+    ntrials = full(nsamples, 200)
+    z = 0.1 * G[:, 0] + 0.1 * random.randn(nsamples)
+    successes = random.binomial(ntrials, 1 / (1 + exp(-z)))
+
+    lik = ("binomial", ntrials)
+    r0 = scan(X, successes, lik, K, verbose=False)
+    tau = r0.null_params["tau"]
+    assert tau.max() < limix.qtl._scan._TAU_RATIO * tau.min()
+
+    monkeypatch.setattr(limix.qtl._scan, "_TAU_RATIO", 1.0)
+    r1 = scan(X, successes, lik, K, verbose=False)
+    assert_allclose(r0.stats["pv20"], r1.stats["pv20"], rtol=1e-4)
+
+
 def test_qtl_scan_glmm_wrong_dimensions():
     random = RandomState(0)
     nsamples = 25
@@ -441,12 +723,41 @@ def test_qtl_finite():
         scan(X, successes, ("binomial", ntrials), K, verbose=False)
     K[0, 0] = 1.0
 
+    # Caught even though the eigendecomposition only reads the lower triangle of K.
+    K[0, 1] = nan
+    with pytest.raises(ValueError):
+        scan(X, successes, ("binomial", ntrials), K, verbose=False)
+    with pytest.raises(ValueError):
+        scan(X, successes, ("binomial", ntrials), K, low_rank=2, verbose=False)
+    K[0, 1] = K[1, 0]
+
     X[0, 0] = nan
     with pytest.raises(ValueError):
         scan(X, successes, ("binomial", ntrials), K, verbose=False)
     X[0, 0] = 1.0
 
 
+@pytest.mark.parametrize("numba", [True, False])
+def test_qtl_is_all_finite(numba, monkeypatch):
+    import limix.qtl._assert
+    from limix.qtl._assert import is_all_finite
+
+    if not numba:
+        monkeypatch.setattr(limix.qtl._assert, "_get_kernel", lambda name: None)
+
+    a = RandomState(0).randn(5, 4)
+    assert is_all_finite(a)
+    assert is_all_finite(a[:, ::2])
+    assert is_all_finite([1e308, 1e308])
+
+    for v in [nan, float("inf"), -float("inf")]:
+        b = a.copy()
+        b[3, 2] = v
+        assert not is_all_finite(b)
+        assert not is_all_finite(b.T)
+        assert not is_all_finite(b[:, ::2])
+
+
 def vec(x):
     return reshape(x, (-1,) + x.shape[2:], order="F")
 